@@ -2,30 +2,88 @@
 This module provides functions for interacting with the API for asset processing jobs.
 
 It includes functions for fetching jobs, updating job details, managing job heartbeats,
-fetching assets and their files, and updating asset content. The module uses aiohttp
-for asynchronous HTTP requests and handles various error scenarios.
+fetching assets and their files, and updating asset content. The module uses a single
+shared aiohttp session for fetching jobs, assets and files, and a single shared httpx
+client speaking HTTP/2 for job and asset updates, so connections to the API are kept
+alive and reused. It also handles various error scenarios.
 
 Key components:
 1. ApiError: Custom exception for API-related errors.
 2. fetch_jobs: Retrieves a list of asset processing jobs from the API.
-3. update_job_details: Updates the details of a specific job.
-4. update_job_heartbeat: Updates the heartbeat of a job to indicate it's still active.
-5. fetch_asset: Retrieves information about a specific asset.
-6. fetch_asset_file: Downloads the file associated with an asset.
-7. update_asset_content: Updates the content of an asset, including token count.
+3. stream_jobs: Yields snapshots of asset processing jobs as the API pushes them.
+4. update_job_details: Updates the details of a specific job.
+5. update_job_heartbeat: Updates the heartbeat of a job to indicate it's still active.
+6. fetch_asset: Retrieves information about a specific asset.
+7. fetch_asset_file: Downloads the file associated with an asset to a temporary file.
+8. complete_job: Stores a job's processed content and marks the job as completed.
+9. get_session / get_client / close_session: Manage the shared HTTP clients.
+10. preload_tokenizer: Loads the tokenizer ahead of the first job.
 
 The module uses configuration settings from the config module and logging from the logger module.
 It also utilizes the Asset and AssetProcessingJob models for type hinting and data structure.
 """
 
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+from urllib.parse import urlparse
 
 import aiohttp
+import httpx
+import msgspec
+import orjson
 import tiktoken
 from asset_processing_service.config import HEADERS, config
 from asset_processing_service.logger import logger
-from asset_processing_service.models import Asset, AssetProcessingJob
+from asset_processing_service.models import (
+    Asset,
+    AssetProcessingJob,
+    AssetProcessingJobSnapshot,
+)
+
+# Decoders that build the models straight from response bytes in a single pass.
+_SNAPSHOT_DECODER = msgspec.json.Decoder(AssetProcessingJobSnapshot)
+_JOBS_DECODER = msgspec.json.Decoder(List[AssetProcessingJob])
+_ASSET_DECODER = msgspec.json.Decoder(Optional[Asset])
+
+# Model whose encoding is used to count the tokens in asset content.
+_TOKENIZER_MODEL = "gpt-4o"
+
+# Token counts keyed by (content digest, model), so retried jobs and re-uploaded
+# assets skip the BPE pass entirely.
+_TOKEN_COUNT_CACHE_SIZE = 512
+_token_count_cache: "OrderedDict[tuple, int]" = OrderedDict()
+
+# Shared HTTP clients, created on first use and closed by close_session().
+_session: Optional[aiohttp.ClientSession] = None
+_client: Optional[httpx.AsyncClient] = None
+
+# The job stream sends a keepalive line at least every 30 seconds, so a read
+# that stalls for longer than this means the connection is gone.
+_STREAM_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_read=90)
+
+# Request bodies are serialized with orjson and sent as raw bytes.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Asset files are streamed to disk in chunks of this size.
+_DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Downloaded chunks are written to disk this many at a time, with a single
+# vectored write off the event loop.
+_WRITE_BATCH_SIZE = 8
+
+# Content longer than this is split on paragraph boundaries and tokenized in
+# parallel by tiktoken's native worker threads. Splits only happen before a
+# letter or digit, since no pre-token of the supported encodings runs from a
+# newline into one, so the parts add up to the same count as the whole.
+_BATCH_TOKENIZE_THRESHOLD_CHARS = 256 * 1024
+_PARAGRAPH_BOUNDARY = re.compile(r"(?<=\n\n)(?=[^\W_])")
 
 
 class ApiError(Exception):
@@ -43,6 +101,145 @@ class ApiError(Exception):
         super().__init__(self.message)
 
 
+async def get_session() -> aiohttp.ClientSession:
+    """
+    Returns the shared aiohttp session, creating it on first use.
+
+    The session keeps a pool of keep-alive connections that is reused by every
+    request in this module, so only the first request to a host pays for the
+    TCP and TLS handshakes.
+
+    Returns:
+        aiohttp.ClientSession: The shared session.
+    """
+    global _session
+
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=64, limit_per_host=32, keepalive_timeout=75
+        )
+        _session = aiohttp.ClientSession(connector=connector, headers=HEADERS)
+
+    return _session
+
+
+async def get_client() -> httpx.AsyncClient:
+    """
+    Returns the shared httpx client used for job and asset updates, creating it
+    on first use.
+
+    The client negotiates HTTP/2 where the API supports it, so concurrent updates
+    from all workers are multiplexed over a single connection instead of queuing
+    for a free HTTP/1.1 connection. Its timeouts match aiohttp's defaults, since
+    httpx otherwise gives up after 5 seconds, which is too short for storing the
+    content of a large asset.
+
+    Returns:
+        httpx.AsyncClient: The shared client.
+    """
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            headers=HEADERS,
+            limits=httpx.Limits(max_connections=16),
+            timeout=httpx.Timeout(300.0, connect=30.0),
+        )
+
+    return _client
+
+
+async def close_session() -> None:
+    """
+    Closes the shared aiohttp session and httpx client, if they were created.
+    """
+    global _session, _client
+
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _now_iso() -> str:
+    """
+    Returns the current UTC time as an ISO 8601 string with second precision.
+
+    Returns:
+        str: The current time, e.g. "2024-10-01T10:00:00+00:00".
+    """
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+@lru_cache(maxsize=4)
+def _get_encoding(model: str) -> tiktoken.Encoding:
+    """
+    Returns the tiktoken encoding for a model, building it only once per process.
+
+    Args:
+        model (str): The name of the model whose encoding should be loaded.
+
+    Returns:
+        tiktoken.Encoding: The cached encoding for the model.
+    """
+    return tiktoken.encoding_for_model(model)
+
+
+async def preload_tokenizer() -> None:
+    """
+    Loads the tokenizer encoding used for token counts, so the first job doesn't
+    pay for downloading and parsing it.
+
+    The encoding is built in a worker thread to keep the event loop responsive.
+    """
+    await asyncio.to_thread(_get_encoding, _TOKENIZER_MODEL)
+
+
+def _count_tokens(content: str, model: str, encoded: Optional[bytes] = None) -> int:
+    """
+    Counts the tokens in a piece of content, reusing the result for identical content.
+
+    Args:
+        content (str): The text to tokenize.
+        model (str): The name of the model whose encoding should be used.
+        encoded (Optional[bytes]): The content encoded as UTF-8, if the caller already
+            has it, so it doesn't need to be encoded again to be hashed.
+
+    Returns:
+        int: The number of tokens in the content.
+    """
+    if encoded is None:
+        encoded = content.encode("utf-8")
+    content_hash = hashlib.blake2b(encoded, digest_size=16).digest()
+    key = (content_hash, model)
+
+    token_count = _token_count_cache.get(key)
+    if token_count is not None:
+        _token_count_cache.move_to_end(key)
+        return token_count
+
+    encoding = _get_encoding(model)
+    if len(content) > _BATCH_TOKENIZE_THRESHOLD_CHARS:
+        parts = _PARAGRAPH_BOUNDARY.split(content)
+        token_count = sum(
+            len(tokens)
+            for tokens in encoding.encode_ordinary_batch(
+                parts, num_threads=os.cpu_count() or 1
+            )
+        )
+    else:
+        token_count = len(encoding.encode_ordinary(content))
+    _token_count_cache[key] = token_count
+    if len(_token_count_cache) > _TOKEN_COUNT_CACHE_SIZE:
+        _token_count_cache.popitem(last=False)
+
+    return token_count
+
+
 async def fetch_jobs() -> List[AssetProcessingJob]:
     """
     Fetches a list of asset processing jobs from the API.
@@ -55,23 +252,53 @@ async def fetch_jobs() -> List[AssetProcessingJob]:
     try:
         url = f"{config.API_BASE_URL}/asset-processing-job"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=HEADERS) as response:
-                if response.status == 200:
-                    data = await response.json()
+        session = await get_session()
+        async with session.get(url) as response:
+            if response.status == 200:
+                body = await response.read()
 
-                    # Parse the JSON data into AssetProcessingJob instances
-                    jobs = [AssetProcessingJob(**item) for item in data]
-                    return jobs
+                # Parse the JSON body into AssetProcessingJob instances
+                return _JOBS_DECODER.decode(body)
 
-                else:
-                    logger.error(f"Error fetching jobs: {response.status}")
-                    return []
+            else:
+                logger.error(f"Error fetching jobs: {response.status}")
+                return []
     except aiohttp.ClientError as error:
         logger.error(f"Error fetching jobs: {error}")
         return []
 
 
+async def stream_jobs() -> AsyncIterator[AssetProcessingJobSnapshot]:
+    """
+    Streams snapshots of asset processing jobs from the API as newline-delimited JSON.
+
+    The API keeps the connection open and re-sends every job that is not in a
+    terminal state each time it checks for jobs, one job per line, and sends
+    nothing but empty keepalive lines while there are none. The iterator ends
+    when the API closes the stream.
+
+    Yields:
+        AssetProcessingJobSnapshot: The next job sent by the API, along with the
+            time the API read it.
+
+    Raises:
+        ApiError: If the API responds with a non-200 status code. A status code
+            of 404 means the API does not support streaming jobs.
+        ValueError: If the API sends a line that is too long or can't be decoded.
+    """
+    url = f"{config.API_BASE_URL}/asset-processing-job/stream"
+
+    session = await get_session()
+    async with session.get(url, timeout=_STREAM_TIMEOUT) as response:
+        if response.status != 200:
+            raise ApiError("Failed to stream jobs", status_code=response.status)
+
+        async for line in response.content:
+            line = line.strip()
+            if line:
+                yield _SNAPSHOT_DECODER.decode(line)
+
+
 async def update_job_details(job_id: str, update_data: Dict[str, Any]) -> None:
     """
     Updates the details of a specific job.
@@ -81,17 +308,19 @@ async def update_job_details(job_id: str, update_data: Dict[str, Any]) -> None:
         update_data (Dict[str, Any]): A dictionary containing the data to update.
 
     Raises:
-        aiohttp.ClientError: If there's an error during the API request.
+        httpx.HTTPError: If there's an error during the API request.
 
     Logs errors if the update fails.
     """
-    data = {**update_data, "lastHeartBeat": datetime.now().isoformat()}
+    data = {**update_data, "lastHeartBeat": _now_iso()}
     try:
         url = f"{config.API_BASE_URL}/asset-processing-job?jobId={job_id}"
-        async with aiohttp.ClientSession() as session:
-            async with session.patch(url, json=data, headers=HEADERS) as response:
-                response.raise_for_status()
-    except aiohttp.ClientError as error:
+        client = await get_client()
+        response = await client.patch(
+            url, content=orjson.dumps(data), headers=_JSON_HEADERS
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as error:
         logger.error(f"Failed to update job details for job {job_id}: {error}")
 
 
@@ -103,17 +332,19 @@ async def update_job_heartbeat(job_id: str) -> None:
         job_id (str): The ID of the job to update.
 
     Raises:
-        aiohttp.ClientError: If there's an error during the API request.
+        httpx.HTTPError: If there's an error during the API request.
 
     Logs errors if the heartbeat update fails.
     """
     try:
         url = f"{config.API_BASE_URL}/asset-processing-job?jobId={job_id}"
-        data = {"lastHeartBeat": datetime.now().isoformat()}
-        async with aiohttp.ClientSession() as session:
-            async with session.patch(url, json=data, headers=HEADERS) as response:
-                response.raise_for_status()
-    except aiohttp.ClientError as error:
+        data = {"lastHeartBeat": _now_iso()}
+        client = await get_client()
+        response = await client.patch(
+            url, content=orjson.dumps(data), headers=_JSON_HEADERS
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as error:
         logger.error(f"Failed to update job heartbeat for job {job_id}: {error}")
 
 
@@ -132,79 +363,143 @@ async def fetch_asset(asset_id: str) -> Optional[Asset]:
     try:
         url = f"{config.API_BASE_URL}/asset?assetId={asset_id}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=HEADERS) as response:
-                if response.status == 200:
-                    data = await response.json()
-
-                    if data:
-                        return Asset(**data)
-
-                    return None
+        session = await get_session()
+        async with session.get(url) as response:
+            if response.status == 200:
+                body = await response.read()
+                return _ASSET_DECODER.decode(body)
 
-                else:
-                    logger.error(f"Error fetching asset: {response.status}")
-                    return None
+            else:
+                logger.error(f"Error fetching asset: {response.status}")
+                return None
     except aiohttp.ClientError as error:
         logger.error(f"Error fetching asset: {error}")
         return None
 
 
-async def fetch_asset_file(file_url: str) -> bytes:
+def _write_chunks(fd: int, chunks: List[bytes]) -> None:
+    """
+    Writes chunks to a file descriptor with as few system calls as possible.
+
+    Args:
+        fd (int): The file descriptor to write to.
+        chunks (List[bytes]): The chunks to write, in order.
+    """
+    views = [memoryview(chunk) for chunk in chunks]
+
+    while views:
+        if hasattr(os, "writev"):
+            written = os.writev(fd, views)
+        else:
+            written = os.write(fd, views[0])
+
+        # Drop what was written, which may end partway through a chunk
+        while views and written >= len(views[0]):
+            written -= len(views.pop(0))
+        if views:
+            views[0] = views[0][written:]
+
+
+async def _write_batch(fd: int, chunks: List[bytes]) -> None:
+    """
+    Writes a batch of chunks to a file descriptor from a worker thread.
+
+    Args:
+        fd (int): The file descriptor to write to.
+        chunks (List[bytes]): The chunks to write, in order.
+    """
+    write = asyncio.ensure_future(asyncio.to_thread(_write_chunks, fd, chunks))
+    try:
+        await asyncio.shield(write)
+    except asyncio.CancelledError:
+        # Let the write finish before the caller closes the file under it
+        await asyncio.wait([write])
+        raise
+
+
+async def fetch_asset_file(file_url: str) -> str:
     """
-    Downloads the file associated with an asset.
+    Downloads the file associated with an asset to a temporary file.
+
+    The response body is streamed to disk in chunks, so memory use stays bounded
+    regardless of the size of the file. Chunks are written in batches from a worker
+    thread, so disk writes don't block the event loop. The caller is responsible
+    for removing the file once it's no longer needed.
 
     Args:
         file_url (str): The URL of the file to download.
 
     Returns:
-        bytes: The content of the file.
+        str: The path of the temporary file holding the downloaded content.
 
     Raises:
         ApiError: If there's an error fetching the file.
 
     Logs errors if the file download fails.
     """
+    suffix = os.path.splitext(urlparse(file_url).path)[1]
+    temp_file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(file_url, headers=HEADERS) as response:
+        with temp_file:
+            session = await get_session()
+            async with session.get(file_url) as response:
                 response.raise_for_status()
-                return await response.read()
+                fd = temp_file.fileno()
+                batch = []
+                chunks = response.content.iter_chunked(_DOWNLOAD_CHUNK_SIZE)
+                async for chunk in chunks:
+                    batch.append(chunk)
+                    if len(batch) == _WRITE_BATCH_SIZE:
+                        await _write_batch(fd, batch)
+                        batch = []
+                if batch:
+                    await _write_batch(fd, batch)
     except aiohttp.ClientError as error:
+        os.remove(temp_file.name)
         logger.error(f"Error fetching asset file: {error}")
         raise ApiError("Failed to fetch asset file", status_code=500)
+    except BaseException:
+        os.remove(temp_file.name)
+        raise
+
+    return temp_file.name
 
 
-async def update_asset_content(asset_id: str, content: str) -> None:
+async def complete_job(job_id: str, content: Union[str, bytes]) -> None:
     """
-    Updates the content of an asset, including calculating and updating the token count.
+    Stores the processed content on the job's asset, including its token count,
+    and marks the job as completed, all in a single request.
 
     Args:
-        asset_id (str): The ID of the asset to update.
-        content (str): The new content for the asset.
+        job_id (str): The ID of the job to complete.
+        content (Union[str, bytes]): The processed content for the job's asset,
+            either as text or as UTF-8 encoded bytes.
 
     Raises:
-        ApiError: If there's an error updating the asset content.
+        ApiError: If there's an error completing the job.
 
     Logs errors if the update fails.
     """
     try:
-        encoding = tiktoken.encoding_for_model("gpt-4o")
-        tokens = encoding.encode(content)
-        token_count = len(tokens)
+        encoded = None
+        if isinstance(content, bytes):
+            encoded, content = content, content.decode("utf-8")
 
-        update_data = {
+        token_count = _count_tokens(content, _TOKENIZER_MODEL, encoded)
+
+        complete_data = {
             "content": content,
             "tokenCount": token_count,
         }
 
-        async with aiohttp.ClientSession() as session:
-            url = f"{config.API_BASE_URL}/asset?assetId={asset_id}"
-            async with session.patch(
-                url, json=update_data, headers=HEADERS
-            ) as response:
-                response.raise_for_status()
+        url = f"{config.API_BASE_URL}/asset-processing-job/{job_id}/complete"
+        client = await get_client()
+        response = await client.post(
+            url, content=orjson.dumps(complete_data), headers=_JSON_HEADERS
+        )
+        response.raise_for_status()
 
-    except aiohttp.ClientError as error:
-        logger.error(f"Failed to update asset content for asset {asset_id}: {error}")
-        raise ApiError("Failed to update asset content", status_code=500)
+    except httpx.HTTPError as error:
+        logger.error(f"Failed to complete job {job_id}: {error}")
+        raise ApiError("Failed to complete job", status_code=500)
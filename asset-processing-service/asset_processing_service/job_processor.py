@@ -12,11 +12,12 @@ job status information throughout the processing lifecycle.
 
 import asyncio
 import os
+from collections import OrderedDict
 
 from asset_processing_service.api_client import (
+    complete_job,
     fetch_asset,
     fetch_asset_file,
-    update_asset_content,
     update_job_details,
     update_job_heartbeat,
 )
@@ -29,16 +30,22 @@ from asset_processing_service.media_processor import (
 )
 from asset_processing_service.models import AssetProcessingJob
 
+# File URLs of assets whose jobs haven't completed yet, so a retried job can start
+# downloading its file while the asset is still being fetched. The least recently
+# used entries are evicted once the cache is full.
+_FILE_URL_CACHE_SIZE = 256
+_file_url_cache: "OrderedDict[str, str]" = OrderedDict()
+
 
 async def process_job(job: AssetProcessingJob) -> None:
     """
     Process a single asset job.
 
     This function handles the entire lifecycle of job processing, including:
-    - Updating job status
-    - Fetching the asset
+    - Updating job status and fetching the asset concurrently
+    - Downloading the asset file, starting early for retried jobs
     - Processing different types of assets (text, audio, video)
-    - Updating asset content
+    - Storing the asset content and completing the job
     - Handling errors and updating job status accordingly
 
     Args:
@@ -50,30 +57,59 @@ async def process_job(job: AssetProcessingJob) -> None:
     """
     logger.info(f"Processing job {job.id}...")
 
-    heartbeat_task = asyncio.create_task(heartbeat_updater(job.id))
+    heartbeat_task = None
+    download_task = None
+    file_path = None
 
     try:
-        # Update job status to "in_progress"
-        await update_job_details(job.id, {"status": "in_progress"})
-
-        # Fetch asset associated with asset processing job
-        asset = await fetch_asset(job.assetId)
+        # Start downloading the file right away if it's known from a previous attempt
+        cached_file_url = _file_url_cache.get(job.assetId)
+        if cached_file_url is not None:
+            download_task = asyncio.create_task(fetch_asset_file(cached_file_url))
+
+        # Update job status to "in_progress" while fetching the asset associated
+        # with the asset processing job
+        _, asset = await asyncio.gather(
+            update_job_details(job.id, {"status": "in_progress"}),
+            fetch_asset(job.assetId),
+        )
         if asset is None:
             raise ValueError(f"Asset with ID {job.assetId} not found")
 
-        file_buffer = await fetch_asset_file(asset.fileUrl)
+        _file_url_cache[job.assetId] = asset.fileUrl
+        _file_url_cache.move_to_end(job.assetId)
+        if len(_file_url_cache) > _FILE_URL_CACHE_SIZE:
+            _file_url_cache.popitem(last=False)
 
         content_type = asset.fileType
         content = ""
 
+        # Text jobs finish almost immediately, so only audio and video jobs need
+        # heartbeats to show they're still alive
+        if content_type in ["audio", "video"]:
+            heartbeat_task = asyncio.create_task(heartbeat_updater(job.id))
+
+        if download_task is not None and cached_file_url == asset.fileUrl:
+            file_path = await download_task
+            download_task = None
+        else:
+            # The asset's file has changed since the previous attempt, so stop
+            # downloading the old one before fetching the new one
+            if download_task is not None:
+                await _discard_download(download_task)
+                download_task = None
+            file_path = await fetch_asset_file(asset.fileUrl)
+
         # Process different types of assets
         if content_type in ["text", "markdown"]:
             logger.info(f"Text file detected. Reading content of {asset.fileName}")
-            content = file_buffer.decode("utf-8")
+            # Passed on as bytes; complete_job decodes it once and reuses the
+            # bytes when hashing the content for the token count cache
+            content = await asyncio.to_thread(_read_file, file_path)
         elif content_type == "audio":
             logger.info("Processing audio file...")
             chunks = await split_audio_file(
-                file_buffer,
+                file_path,
                 config.MAX_CHUNK_SIZE_BYTES,
                 os.path.basename(asset.fileName),
             )
@@ -82,7 +118,7 @@ async def process_job(job: AssetProcessingJob) -> None:
         elif content_type == "video":
             logger.info("Processing video file...")
             chunks = await extract_audio_and_split(
-                file_buffer,
+                file_path,
                 config.MAX_CHUNK_SIZE_BYTES,
                 os.path.basename(asset.fileName),
             )
@@ -91,16 +127,18 @@ async def process_job(job: AssetProcessingJob) -> None:
         else:
             raise ValueError(f"Unsupported content type: {content_type}")
 
-        logger.info(f"FINAL CONTENT: {content}")
+        logger.debug("Final content length: %d", len(content))
 
-        # Update asset content
-        await update_asset_content(asset.id, content)
-
-        # Update job status to completed
-        await update_job_details(job.id, {"status": "completed"})
+        # Store the asset content and mark the job as completed
+        await complete_job(job.id, content)
+        _file_url_cache.pop(job.assetId, None)
 
     except Exception as e:
         logger.error(f"Error processing job {job.id}: {e}")
+        # The job won't be retried once it has used up its attempts
+        if job.attempts + 1 >= config.MAX_JOB_ATTEMPTS:
+            _file_url_cache.pop(job.assetId, None)
+
         error_message = str(e)
         await update_job_details(
             job.id,
@@ -112,11 +150,49 @@ async def process_job(job: AssetProcessingJob) -> None:
         )
 
     finally:
-        heartbeat_task.cancel()
-        try:
-            await heartbeat_task
-        except asyncio.CancelledError:
-            pass
+        if download_task is not None:
+            await _discard_download(download_task)
+
+        if file_path is not None and os.path.exists(file_path):
+            os.remove(file_path)
+
+        if heartbeat_task is not None:
+            heartbeat_task.cancel()
+            try:
+                await heartbeat_task
+            except asyncio.CancelledError:
+                pass
+
+
+def _read_file(file_path: str) -> bytes:
+    """
+    Reads the whole content of a file.
+
+    Args:
+        file_path (str): The path of the file to read.
+
+    Returns:
+        bytes: The content of the file.
+    """
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+async def _discard_download(download_task: "asyncio.Task[str]") -> None:
+    """
+    Cancels a speculative file download and removes the file if it already finished.
+
+    Args:
+        download_task (asyncio.Task[str]): The task downloading the file.
+    """
+    download_task.cancel()
+    try:
+        file_path = await download_task
+    except (asyncio.CancelledError, Exception):
+        return
+
+    if os.path.exists(file_path):
+        os.remove(file_path)
 
 
 async def heartbeat_updater(job_id: str):
@@ -125,15 +201,16 @@ async def heartbeat_updater(job_id: str):
 
     This function runs in a loop, updating the job's heartbeat at regular intervals
     until it's cancelled. It helps to keep track of long-running jobs and detect
-    if they become stuck.
+    if they become stuck. The first heartbeat is sent after one interval, since
+    marking the job as in progress already records a heartbeat.
 
     Args:
         job_id (str): The ID of the job to update the heartbeat for.
     """
     while True:
         try:
-            await update_job_heartbeat(job_id)
             await asyncio.sleep(config.HEARTBEAT_INTERVAL_SECONDS)
+            await update_job_heartbeat(job_id)
         except asyncio.CancelledError:
             break
         except Exception as e:
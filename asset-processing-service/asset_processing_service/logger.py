@@ -33,6 +33,9 @@ def setup_logger():
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
 
+    # httpx logs every request at INFO, which would flood the output with heartbeats
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
     return logger
 
 
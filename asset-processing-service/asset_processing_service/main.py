@@ -1,88 +1,181 @@
 """
 This module implements an asynchronous job processing system for asset processing.
 
-The system consists of a job fetcher that continuously retrieves jobs from an API,
+The system consists of a job fetcher that continuously receives jobs from an API,
 and multiple workers that process these jobs concurrently. It handles job status
 updates, retries failed jobs, and manages stuck jobs.
 
 Key components:
-1. job_fetcher: Fetches jobs and manages their statuses.
-2. worker: Processes individual jobs.
-3. async_main: Sets up and coordinates the job fetcher and workers.
-4. main: Entry point that runs the async_main function.
+1. handle_job: Manages the status of a single job received from the API.
+2. job_fetcher: Receives jobs pushed by the API, falling back to job_poller.
+3. job_poller: Polls the API for jobs.
+4. worker: Processes individual jobs.
+5. async_main: Sets up and coordinates the job fetcher and workers.
+6. main: Entry point that runs the async_main function.
 
 The system uses asyncio for concurrent operations and implements error handling
 and logging throughout.
 """
 
 import asyncio
-from collections import defaultdict
-from datetime import datetime
-
-from asset_processing_service.api_client import fetch_jobs, update_job_details
+import time
+from dataclasses import dataclass, field
+from typing import Dict
+
+from asset_processing_service.api_client import (
+    ApiError,
+    close_session,
+    fetch_jobs,
+    preload_tokenizer,
+    stream_jobs,
+    update_job_details,
+)
 from asset_processing_service.config import config
 from asset_processing_service.job_processor import process_job
 from asset_processing_service.logger import logger
+from asset_processing_service.models import AssetProcessingJob
+
+
+@dataclass
+class _JobState:
+    """
+    Tracks a job that is pending or in progress.
+
+    Attributes:
+        lock (asyncio.Lock): Lock held by the worker while it processes the job.
+    """
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+async def handle_job(
+    job: AssetProcessingJob,
+    current_time: float,
+    job_queue: asyncio.Queue,
+    job_states: Dict[str, _JobState],
+):
+    """
+    Manages the status of a single job received from the API.
 
+    This function:
+    1. Checks if the job is stuck and marks it as failed.
+    2. Adds new or failed jobs to the queue for processing, skipping them while
+       the queue is full.
+    3. Handles jobs that have exceeded the maximum number of attempts.
 
-async def job_fetcher(job_queue: asyncio.Queue, jobs_pending_or_in_progress: set):
+    Args:
+        job (AssetProcessingJob): The job received from the API.
+        current_time (float): The time the job was received, as a POSIX timestamp.
+        job_queue (asyncio.Queue): Queue to add jobs for processing.
+        job_states (Dict[str, _JobState]): State of the jobs currently being processed
+            or pending, keyed by job ID.
     """
-    Continuously fetches jobs from the API and manages their statuses.
+    if job.status == "in_progress" and job.lastHeartBeat:
+        last_heartbeat_time = job.lastHeartBeat.timestamp()
+        time_since_last_heartbeat = abs(current_time - last_heartbeat_time)
+        logger.info(
+            f"Time since last heartbeat for job {job.id}: {time_since_last_heartbeat}"
+        )
+
+        if time_since_last_heartbeat > config.STUCK_JOB_THRESHOLD_SECONDS:
+            logger.info(f"Job {job.id} is stuck. Failing job.")
+            await update_job_details(
+                job.id,
+                {
+                    "status": "failed",
+                    "errorMessage": "Job is stuck - no heartbeat received recently",
+                    "attempts": job.attempts + 1,
+                },
+            )
+            # A tracked job is still queued or being processed, so its state is
+            # left for its worker to clear once the worker is done with it
+
+    elif job.status in ["created", "failed"]:
+        if job.attempts >= config.MAX_JOB_ATTEMPTS:
+            logger.info(f"Job {job.id} has exceeded max attempts. Failing job.")
+            await update_job_details(
+                job.id,
+                {
+                    "status": "max_attempts_exceeded",
+                    "errorMessage": "Max attempts exceeded",
+                },
+            )
+
+        elif job.id not in job_states:
+            # Waiting for room would leave this job to be queued as it was when it
+            # was received, so a full queue skips it until it is received again
+            try:
+                job_queue.put_nowait(job)
+            except asyncio.QueueFull:
+                logger.info(f"Job queue is full. Skipping job {job.id} for now.")
+                return
+
+            logger.info(f"Adding job to queue: {job.id}")
+            job_states[job.id] = _JobState()
+
+
+async def job_fetcher(job_queue: asyncio.Queue, job_states: Dict[str, _JobState]):
+    """
+    Receives jobs pushed by the API and manages their statuses.
 
     This function:
-    1. Fetches jobs from the API.
-    2. Checks for stuck jobs and marks them as failed.
-    3. Adds new or failed jobs to the queue for processing.
-    4. Handles jobs that have exceeded the maximum number of attempts.
+    1. Opens the job stream and handles each job as it arrives, checking for
+       stuck jobs against the time the API read the job.
+    2. Reconnects whenever the API closes the stream.
+    3. Falls back to polling if the API does not support streaming jobs or
+       sends a stream that can't be read.
 
     Args:
         job_queue (asyncio.Queue): Queue to add jobs for processing.
-        jobs_pending_or_in_progress (set): Set of job IDs currently being processed or pending.
+        job_states (Dict[str, _JobState]): State of the jobs currently being processed
+            or pending, keyed by job ID.
     """
     while True:
         try:
-            current_time = datetime.now().timestamp()
+            logger.info("Opening job stream")
+            async for snapshot in stream_jobs():
+                current_time = snapshot.sentAt.timestamp()
+                await handle_job(snapshot.job, current_time, job_queue, job_states)
+
+        except ApiError as e:
+            if e.status_code == 404:
+                logger.info("Job stream not supported by the API. Polling for jobs.")
+                break
+
+            logger.error(f"Error streaming jobs: {e} ({e.status_code})")
+            await asyncio.sleep(3)
+
+        except ValueError as e:
+            # The same line would be sent again after reconnecting
+            logger.error(f"Error reading job stream: {e}. Polling for jobs.")
+            break
+
+        except Exception as e:
+            logger.error(f"Error streaming jobs: {e}")
+            await asyncio.sleep(3)
+
+    await job_poller(job_queue, job_states)
+
+
+async def job_poller(job_queue: asyncio.Queue, job_states: Dict[str, _JobState]):
+    """
+    Continuously polls the API for jobs and manages their statuses.
+
+    Used instead of the job stream when the API does not support it.
+
+    Args:
+        job_queue (asyncio.Queue): Queue to add jobs for processing.
+        job_states (Dict[str, _JobState]): State of the jobs currently being processed
+            or pending, keyed by job ID.
+    """
+    while True:
+        try:
+            current_time = time.time()
             logger.info(f"Fetching jobs: {current_time}")
             jobs = await fetch_jobs()
 
             for job in jobs:
-                if job.status == "in_progress" and job.lastHeartBeat:
-                    last_heartbeat_time = job.lastHeartBeat.timestamp()
-                    time_since_last_heartbeat = abs(current_time - last_heartbeat_time)
-                    logger.info(
-                        f"Time since last heartbeat for job {job.id}: {time_since_last_heartbeat}"
-                    )
-
-                    if time_since_last_heartbeat > config.STUCK_JOB_THRESHOLD_SECONDS:
-                        logger.info(f"Job {job.id} is stuck. Failing job.")
-                        await update_job_details(
-                            job.id,
-                            {
-                                "status": "failed",
-                                "errorMessage": "Job is stuck - no heartbeat received recently",
-                                "attempts": job.attempts + 1,
-                            },
-                        )
-                        if job.id in jobs_pending_or_in_progress:
-                            jobs_pending_or_in_progress.remove(job.id)
-
-                elif job.status in ["created", "failed"]:
-                    if job.attempts >= config.MAX_JOB_ATTEMPTS:
-                        logger.info(
-                            f"Job {job.id} has exceeded max attempts. Failing job."
-                        )
-                        await update_job_details(
-                            job.id,
-                            {
-                                "status": "max_attempts_exceeded",
-                                "errorMessage": "Max attempts exceeded",
-                            },
-                        )
-
-                    elif job.id not in jobs_pending_or_in_progress:
-                        logger.info(f"Adding job to queue: {job.id}")
-                        jobs_pending_or_in_progress.add(job.id)
-                        await job_queue.put(job)
+                await handle_job(job, current_time, job_queue, job_states)
 
             await asyncio.sleep(3)
 
@@ -94,8 +187,7 @@ async def job_fetcher(job_queue: asyncio.Queue, jobs_pending_or_in_progress: set
 async def worker(
     worker_id: int,
     job_queue: asyncio.Queue,
-    jobs_pending_or_in_progress: set,
-    job_locks: dict,
+    job_states: Dict[str, _JobState],
 ):
     """
     Processes jobs from the queue.
@@ -104,19 +196,22 @@ async def worker(
     1. Retrieves jobs from the queue.
     2. Processes each job using the process_job function.
     3. Handles errors during job processing.
-    4. Updates job status and manages the jobs_pending_or_in_progress set.
+    4. Updates job status and manages the job_states dictionary.
 
     Args:
         worker_id (int): Unique identifier for the worker.
         job_queue (asyncio.Queue): Queue to retrieve jobs from.
-        jobs_pending_or_in_progress (set): Set of job IDs currently being processed or pending.
-        job_locks (dict): Dictionary of locks for each job to ensure thread-safety.
+        job_states (Dict[str, _JobState]): State of the jobs currently being processed
+            or pending, keyed by job ID.
     """
     while True:
         try:
             job = await job_queue.get()
 
-            async with job_locks[job.id]:
+            # handle_job registers every job it queues
+            state = job_states[job.id]
+
+            async with state.lock:
                 logger.info(f"Worker {worker_id} processing job {job.id}...")
                 try:
                     await process_job(job)
@@ -132,8 +227,9 @@ async def worker(
                         },
                     )
                 finally:
-                    jobs_pending_or_in_progress.remove(job.id)
-                    job_locks.pop(job.id, None)
+                    # Only clear the state this worker processed the job under
+                    if job_states.get(job.id) is state:
+                        job_states.pop(job.id)
 
             job_queue.task_done()
         except Exception as e:
@@ -146,35 +242,52 @@ async def async_main():
     Sets up and coordinates the job processing system.
 
     This function:
-    1. Creates a job queue and sets for tracking jobs.
-    2. Initializes the job fetcher task.
-    3. Creates multiple worker tasks.
-    4. Runs all tasks concurrently.
+    1. Preloads the tokenizer so the first job doesn't pay for loading it.
+    2. Creates a bounded job queue and a dictionary for tracking jobs.
+    3. Initializes the job fetcher task.
+    4. Creates multiple worker tasks.
+    5. Runs all tasks concurrently.
+    6. Closes the shared HTTP session on shutdown.
     """
-    job_queue = asyncio.Queue()
-    jobs_pending_or_in_progress = set()
-    job_locks = defaultdict(asyncio.Lock)
+    try:
+        await preload_tokenizer()
+        logger.info("Tokenizer preloaded")
+    except Exception as e:
+        # The first job that needs the tokenizer will try loading it again
+        logger.error(f"Error preloading tokenizer: {e}")
 
-    job_fetcher_task = asyncio.create_task(
-        job_fetcher(job_queue, jobs_pending_or_in_progress)
-    )
+    # Bound the queue so jobs don't pile up in memory; jobs that don't fit are
+    # picked up again from a later snapshot once workers catch up
+    job_queue = asyncio.Queue(maxsize=max(4, 2 * config.MAX_NUM_WORKERS))
+    job_states: Dict[str, _JobState] = {}
 
-    workers = [
-        asyncio.create_task(
-            worker(i + 1, job_queue, jobs_pending_or_in_progress, job_locks)
-        )
-        for i in range(config.MAX_NUM_WORKERS)
-    ]
+    try:
+        job_fetcher_task = asyncio.create_task(job_fetcher(job_queue, job_states))
+
+        workers = [
+            asyncio.create_task(worker(i + 1, job_queue, job_states))
+            for i in range(config.MAX_NUM_WORKERS)
+        ]
 
-    await asyncio.gather(job_fetcher_task, *workers)
+        await asyncio.gather(job_fetcher_task, *workers)
+    finally:
+        await close_session()
 
 
 def main():
     """
     Entry point of the application.
 
-    This function runs the async_main function using asyncio.run().
+    This function runs the async_main function using asyncio.run(), on a uvloop
+    event loop when uvloop is available.
     """
+    try:
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     asyncio.run(async_main())
 
 
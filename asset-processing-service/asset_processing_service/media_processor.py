@@ -18,13 +18,13 @@ extracting audio from video, and transcribing audio chunks.
 
 
 async def split_audio_file(
-    audio_buffer: bytes, max_chunk_size_bytes: int, original_file_name: str
+    audio_path: str, max_chunk_size_bytes: int, original_file_name: str
 ):
     """
     Splits an audio file into chunks of a specified maximum size.
 
     Args:
-        audio_buffer (bytes): The audio file content as bytes.
+        audio_path (str): Path to the audio file on disk.
         max_chunk_size_bytes (int): Maximum size of each chunk in bytes.
         original_file_name (str): Original name of the audio file.
 
@@ -39,21 +39,16 @@ async def split_audio_file(
     temp_dir = tempfile.mkdtemp()
 
     try:
-        # Write the original audio buffer to a temporary file
-        temp_input_path = os.path.join(temp_dir, original_file_name)
-        with open(temp_input_path, "wb") as f:
-            f.write(audio_buffer)
-
         # Check if the file is an MP3 file
         if file_extension.lower() == ".mp3":
             logger.info("Input is an MP3 file. Skipping conversion.")
-            temp_mp3_path = temp_input_path
+            temp_mp3_path = audio_path
         else:
             logger.info("Converting input audio to MP3 format.")
             temp_mp3_path = os.path.join(
                 temp_dir, f"{file_name_without_ext}_converted.mp3"
             )
-            await convert_audio_to_mp3(temp_input_path, temp_mp3_path)
+            await convert_audio_to_mp3(audio_path, temp_mp3_path)
 
         # Probe the audio file to get total size and duration
         probe = await asyncio.to_thread(ffmpeg.probe, temp_mp3_path)
@@ -162,13 +157,13 @@ async def convert_audio_to_mp3(input_path: str, output_path: str):
 
 
 async def extract_audio_and_split(
-    video_buffer: bytes, max_chunk_size_bytes: int, original_file_name: str
+    video_path: str, max_chunk_size_bytes: int, original_file_name: str
 ):
     """
     Extracts audio from a video file and splits it into chunks.
 
     Args:
-        video_buffer (bytes): The video file content as bytes.
+        video_path (str): Path to the video file on disk.
         max_chunk_size_bytes (int): Maximum size of each audio chunk in bytes.
         original_file_name (str): Original name of the video file.
 
@@ -182,16 +177,12 @@ async def extract_audio_and_split(
     os.makedirs(temp_dir, exist_ok=True)
 
     base_file_name = os.path.basename(original_file_name)
-    input_file = os.path.join(temp_dir, base_file_name)
     file_name_without_ext = os.path.splitext(base_file_name)[0]
     output_mp3 = os.path.join(temp_dir, f"{file_name_without_ext}.mp3")
 
     try:
-        with open(input_file, "wb") as f:
-            f.write(video_buffer)
-
         # Use ffmpeg-python instead of subprocess
-        stream = ffmpeg.input(input_file)
+        stream = ffmpeg.input(video_path)
         stream = ffmpeg.output(stream, output_mp3, acodec="libmp3lame", q=0, map="a")
 
         # Run ffmpeg asynchronously
@@ -199,10 +190,8 @@ async def extract_audio_and_split(
             ffmpeg.run, stream, capture_stdout=True, capture_stderr=True
         )
 
-        with open(output_mp3, "rb") as f:
-            mp3_buffer = f.read()
         chunks = await split_audio_file(
-            mp3_buffer, max_chunk_size_bytes, f"{file_name_without_ext}.mp3"
+            output_mp3, max_chunk_size_bytes, f"{file_name_without_ext}.mp3"
         )
 
         return chunks
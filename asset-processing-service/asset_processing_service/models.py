@@ -1,20 +1,21 @@
 """
 This module defines the data models used in the asset processing service.
 
-It includes two main classes:
+It includes three main classes:
 1. AssetProcessingJob: Represents a job for processing an asset.
-2. Asset: Represents an asset in the system.
+2. AssetProcessingJobSnapshot: Represents a job as sent on the job stream.
+3. Asset: Represents an asset in the system.
 
-These models are built using Pydantic, which provides data validation and settings management using Python type annotations.
+These models are built using msgspec Structs, which decode and validate JSON straight into typed objects, including datetime parsing, in a single pass.
 """
 
 from datetime import datetime
 from typing import Literal, Optional
 
-from pydantic import BaseModel
+import msgspec
 
 
-class AssetProcessingJob(BaseModel):
+class AssetProcessingJob(msgspec.Struct):
     """
     Represents a job for processing an asset.
 
@@ -41,7 +42,20 @@ class AssetProcessingJob(BaseModel):
     errorMessage: Optional[str] = None
 
 
-class Asset(BaseModel):
+class AssetProcessingJobSnapshot(msgspec.Struct):
+    """
+    Represents a job as it was at a point in time, as sent on the job stream.
+
+    Attributes:
+        sentAt (datetime): Timestamp when the API read the job.
+        job (AssetProcessingJob): The job, which was not in a terminal state.
+    """
+
+    sentAt: datetime
+    job: AssetProcessingJob
+
+
+class Asset(msgspec.Struct):
     """
     Represents an asset in the system.
 
@@ -0,0 +1,71 @@
+import { db } from "@/server/db";
+import { assetProcessingJobTable, assetTable } from "@/server/db/schema";
+import { eq } from "drizzle-orm";
+import { NextRequest, NextResponse } from "next/server";
+import { z } from "zod";
+
+const completeAssetJobSchema = z.object({
+  content: z.string(),
+  tokenCount: z.number(),
+});
+
+/**
+ * Completes an asset processing job in a single request: stores the processed
+ * content on the job's asset and marks the job as completed.
+ */
+export async function POST(
+  request: NextRequest,
+  { params }: { params: { jobId: string } }
+) {
+  try {
+    const { jobId } = params;
+
+    const body = await request.json();
+    const validationResult = completeAssetJobSchema.safeParse(body);
+
+    if (!validationResult.success) {
+      return NextResponse.json(
+        {
+          error: "Invalid request body",
+          errors: validationResult.error.errors,
+        },
+        { status: 400 }
+      );
+    }
+
+    const { content, tokenCount } = validationResult.data;
+
+    // Both updates go through in a transaction, so a job is never marked as
+    // completed without its asset's content having been stored
+    const updatedJob = await db.transaction(async (tx) => {
+      const [job] = await tx
+        .update(assetProcessingJobTable)
+        .set({ status: "completed" })
+        .where(eq(assetProcessingJobTable.id, jobId))
+        .returning();
+
+      if (!job) {
+        return null;
+      }
+
+      await tx
+        .update(assetTable)
+        .set({ content, tokenCount })
+        .where(eq(assetTable.id, job.assetId));
+
+      return job;
+    });
+
+    if (!updatedJob) {
+      return NextResponse.json({ error: "Job not found" }, { status: 404 });
+    }
+
+    return NextResponse.json(updatedJob);
+  } catch (error) {
+    console.error("Error completing asset processing job", error);
+    return NextResponse.json(
+      { error: "Error completing asset processing job" },
+      { status: 500 }
+    );
+  }
+}
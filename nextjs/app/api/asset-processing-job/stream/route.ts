@@ -0,0 +1,94 @@
+import { db } from "@/server/db";
+import { assetProcessingJobTable } from "@/server/db/schema";
+import { inArray } from "drizzle-orm";
+import { NextRequest } from "next/server";
+
+export const dynamic = "force-dynamic";
+export const maxDuration = 60; // seconds
+
+const POLL_INTERVAL_MS = 3000;
+const KEEPALIVE_INTERVAL_MS = 30000;
+
+/**
+ * Streams asset processing jobs that are not in a terminal state as
+ * newline-delimited JSON, one job per line. Each line carries the time the
+ * jobs were read along with the job, so the asset processing service can
+ * detect stuck jobs against that time rather than the time it got around to
+ * reading the line.
+ *
+ * While there are non-terminal jobs they are re-sent every poll interval.
+ * While there are none, only an empty keepalive line is sent now and then, so
+ * an idle service does no work until a job actually shows up. Polling is
+ * skipped while the client hasn't read the previous batch of jobs yet. The
+ * stream ends when the function hits its max duration and the client is
+ * expected to reconnect.
+ */
+export async function GET(request: NextRequest) {
+  console.log("Streaming asset processing jobs not in a terminal state");
+
+  const encoder = new TextEncoder();
+  let closed = false;
+
+  const stream = new ReadableStream<Uint8Array>({
+    async start(controller) {
+      let lastWriteAt = Date.now();
+
+      while (!closed && !request.signal.aborted) {
+        // Don't queue up more jobs while the client is behind; it only needs
+        // the latest batch
+        if ((controller.desiredSize ?? 0) <= 0) {
+          await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+          continue;
+        }
+
+        try {
+          const availableJobs = await db
+            .select()
+            .from(assetProcessingJobTable)
+            .where(
+              inArray(
+                assetProcessingJobTable.status,
+                // non-terminal states
+                ["created", "failed", "in_progress"]
+              )
+            )
+            .execute();
+
+          if (availableJobs.length > 0) {
+            // Enqueued as a single chunk so the whole batch counts once
+            // against the stream's backpressure
+            const sentAt = new Date();
+            const lines = availableJobs
+              .map((job) => `${JSON.stringify({ sentAt, job })}\n`)
+              .join("");
+            controller.enqueue(encoder.encode(lines));
+            lastWriteAt = Date.now();
+          } else if (Date.now() - lastWriteAt >= KEEPALIVE_INTERVAL_MS) {
+            controller.enqueue(encoder.encode("\n"));
+            lastWriteAt = Date.now();
+          }
+        } catch (error) {
+          console.error("Error streaming asset processing jobs", error);
+          controller.error(error);
+          return;
+        }
+
+        await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+      }
+
+      if (!closed) {
+        controller.close();
+      }
+    },
+    cancel() {
+      closed = true;
+    },
+  });
+
+  return new Response(stream, {
+    headers: {
+      "Content-Type": "application/x-ndjson",
+      "Cache-Control": "no-cache, no-transform",
+    },
+  });
+}
@@ -18,6 +18,7 @@ const isPublicRoute = createRouteMatcher([
 // Define secure routes that require service worker authentication
 const isSecureRoute = createRouteMatcher([
   "/api/asset-processing-job", // API route for processing asset jobs
+  "/api/asset-processing-job/(.*)", // Sub-routes of the asset processing job API
   "/api/asset", // API route for asset management
 ]);
 
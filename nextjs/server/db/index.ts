@@ -1,6 +1,8 @@
-import { sql } from "@vercel/postgres";
+import { createPool } from "@vercel/postgres";
 import { drizzle } from "drizzle-orm/vercel-postgres";
 
 import * as schema from "./schema";
 
-export const db = drizzle(sql, { schema });
+// Built on a pool rather than the `sql` helper so that db.transaction() runs
+// every statement of a transaction on the same connection
+export const db = drizzle(createPool(), { schema });